@@ -4,8 +4,10 @@ import pandas as pd
 import requests
 from datetime import datetime, timezone
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import ProgrammingError
 import logging
+from Pushdown import build_select, build_count_select, read_csv_pushdown, save_pushdown_counts
 
 
 if sys.platform == 'win32':
@@ -55,12 +57,31 @@ def extract_api():
         logger.error(f"API extraction failed: {e}")
         return False
 
+def read_mysql_table(tbl, engine):
+    # Only the columns and rows downstream stages keep cross the network;
+    # the rows left behind are counted so the quality report still shows them
+    counts = {"nulls_filtered": 0, "invalid_filtered": 0}
+    try:
+        # One REPEATABLE READ transaction, so the counts and the rows come from the same snapshot
+        with engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn, conn.begin():
+            df = pd.read_sql(text(build_select(tbl)), conn)
+            count_sql = build_count_select(tbl)
+            if count_sql:
+                nulls, invalid = conn.execute(text(count_sql)).one()
+                counts = {"nulls_filtered": nulls, "invalid_filtered": invalid}
+    except ProgrammingError as e:
+        # Usually schema drift: a column a downstream stage declares is gone at the source
+        logger.error(f"Pushdown query failed for {tbl} ({e}); falling back to SELECT *")
+        df = pd.read_sql(f"SELECT * FROM {tbl}", engine)
+    save_pushdown_counts(EXTRACT_DIR, f"{tbl}.csv", counts)
+    return df
+
 def extract_mysql():
     logger.info("Extracting MySQL tables...")
     try:
         engine = create_engine(f"mysql+mysqlconnector://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
         tables = ["orders", "order_items"]
-        results = [save_csv(add_metadata(pd.read_sql(f"SELECT * FROM {tbl}", engine), f"MySQL:{tbl}"), f"{tbl}.csv") for tbl in tables]
+        results = [save_csv(add_metadata(read_mysql_table(tbl, engine), f"MySQL:{tbl}"), f"{tbl}.csv") for tbl in tables]
         engine.dispose()
         return all(results)
     except Exception as e:
@@ -76,7 +97,8 @@ def extract_datalake():
     results = []
     for f in files:
         try:
-            df = pd.read_csv(os.path.join(DATA_LAKE_DIR, f))
+            df, counts = read_csv_pushdown(os.path.join(DATA_LAKE_DIR, f), f)
+            save_pushdown_counts(EXTRACT_DIR, f, counts)
             results.append(save_csv(add_metadata(df, f"DataLake:{f}"), f))
         except Exception as e:
             logger.error(f"Error extracting {f}: {e}")
@@ -0,0 +1,162 @@
+import os
+import re
+import math
+import sqlite3
+import hashlib
+import pandas as pd
+import logging
+from Pipeline_contracts import INGEST_KEYS
+
+# Logging setup
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INGEST_INDEX_DB = os.getenv("INGEST_INDEX_DB", "ingest_index.db")
+
+BLOOM_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 0.001
+
+# ---------------------------
+# Bloom filter
+# ---------------------------
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys, serialisable to bytes."""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE, bits=None, hashes=None, data=None):
+        self.bits = bits or max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = hashes or max(1, round(self.bits / capacity * math.log(2)))
+        self.data = bytearray(data) if data is not None else bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    @property
+    def capacity(self):
+        """Keys this filter holds at BLOOM_ERROR_RATE; past it false positives climb quickly."""
+        return int(self.bits * math.log(2) ** 2 / -math.log(BLOOM_ERROR_RATE))
+
+    def add(self, key):
+        for p in self._positions(key):
+            self.data[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key):
+        return all(self.data[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+# ---------------------------
+# Key index
+# ---------------------------
+def normalize_key(values):
+    """Join key parts into one string, normalising ids like '1.0' or "b'8'" the way Modeling does."""
+    parts = []
+    for v in values:
+        m = re.search(r'\d+', str(v))
+        parts.append(m.group(0) if m else str(v))
+    return "|".join(parts)
+
+class IngestIndex:
+    """Persistent per-table set of loaded business keys (SQLite) fronted by a Bloom filter."""
+
+    def __init__(self, path=INGEST_INDEX_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS ingest_keys (tbl TEXT NOT NULL, k TEXT NOT NULL, PRIMARY KEY (tbl, k)) WITHOUT ROWID")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS ingest_blooms (tbl TEXT PRIMARY KEY, bits INTEGER, hashes INTEGER, data BLOB)")
+        # Committed byte size of each table's staging ledger file
+        self.conn.execute("CREATE TABLE IF NOT EXISTS ingest_ledgers (tbl TEXT PRIMARY KEY, size INTEGER)")
+        self.conn.commit()
+        self._blooms = {}
+
+    def bloom(self, table):
+        if table not in self._blooms:
+            row = self.conn.execute("SELECT bits, hashes, data FROM ingest_blooms WHERE tbl = ?", (table,)).fetchone()
+            self._blooms[table] = BloomFilter(bits=row[0], hashes=row[1], data=row[2]) if row else BloomFilter()
+        return self._blooms[table]
+
+    def has(self, table):
+        return self.conn.execute("SELECT 1 FROM ingest_blooms WHERE tbl = ?", (table,)).fetchone() is not None
+
+    def keys(self, table, df):
+        return [normalize_key(row) for row in df[INGEST_KEYS[table]].itertuples(index=False, name=None)]
+
+    def seen_mask(self, table, df):
+        """Boolean mask of rows whose key was already loaded by an earlier run."""
+        bloom = self.bloom(table)
+        keys = self.keys(table, df)
+        # Only Bloom-positive keys need a lookup in the on-disk store
+        candidates = [k for k in keys if k in bloom]
+        seen = set()
+        for i in range(0, len(candidates), 500):
+            chunk = candidates[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT k FROM ingest_keys WHERE tbl = ? AND k IN ({','.join('?' * len(chunk))})", (table, *chunk)
+            ).fetchall()
+            seen.update(r[0] for r in rows)
+        return pd.Series([k in seen for k in keys], index=df.index)
+
+    def filter_new(self, table, df):
+        """Drop rows already loaded; returns (new_rows, number_dropped)."""
+        if table not in INGEST_KEYS or df.empty:
+            return df, 0
+        mask = self.seen_mask(table, df)
+        return df[~mask], int(mask.sum())
+
+    def recover(self, table, ledger_path):
+        """Roll the ledger file back to its last committed size.
+
+        Rows appended by a run that died before `record` committed are cut off, so
+        they are neither duplicated nor lost: their keys were never recorded.
+        """
+        row = self.conn.execute("SELECT size FROM ingest_ledgers WHERE tbl = ?", (table,)).fetchone()
+        if row is None or not os.path.exists(ledger_path):
+            return
+        size = os.path.getsize(ledger_path)
+        if size > row[0]:
+            logger.warning(f"Rolling back {size - row[0]} uncommitted bytes in {ledger_path}")
+            with open(ledger_path, "r+b") as f:
+                f.truncate(row[0])
+        elif size < row[0]:
+            # The ledger was replaced behind our back; it no longer matches the keys
+            self.reset(table)
+
+    def record(self, table, df, ledger_path):
+        """Record the keys of rows just written to `ledger_path`, together with its new size, in one transaction."""
+        if table not in INGEST_KEYS:
+            return
+        bloom = self.bloom(table)
+        keys = self.keys(table, df)
+        for k in keys:
+            bloom.add(k)
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO ingest_keys (tbl, k) VALUES (?, ?)", [(table, k) for k in keys])
+            self.conn.execute("INSERT OR REPLACE INTO ingest_blooms (tbl, bits, hashes, data) VALUES (?, ?, ?, ?)",
+                              (table, bloom.bits, bloom.hashes, bytes(bloom.data)))
+            self.conn.execute("INSERT OR REPLACE INTO ingest_ledgers (tbl, size) VALUES (?, ?)",
+                              (table, os.path.getsize(ledger_path)))
+        self._check_capacity(table, bloom)
+
+    def _check_capacity(self, table, bloom):
+        # An overfull filter sends almost every key to SQLite; regrow it from the stored keys
+        count = self.conn.execute("SELECT COUNT(*) FROM ingest_keys WHERE tbl = ?", (table,)).fetchone()[0]
+        if count <= bloom.capacity:
+            return
+        logger.warning(f"{table}: {count:,} keys exceed the Bloom filter capacity ({bloom.capacity:,}); rebuilding it for {2 * count:,}")
+        bloom = BloomFilter(capacity=2 * count)
+        for (k,) in self.conn.execute("SELECT k FROM ingest_keys WHERE tbl = ?", (table,)):
+            bloom.add(k)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO ingest_blooms (tbl, bits, hashes, data) VALUES (?, ?, ?, ?)",
+                              (table, bloom.bits, bloom.hashes, bytes(bloom.data)))
+        self._blooms[table] = bloom
+
+    def reset(self, table):
+        self.conn.execute("DELETE FROM ingest_keys WHERE tbl = ?", (table,))
+        self.conn.execute("DELETE FROM ingest_blooms WHERE tbl = ?", (table,))
+        self.conn.execute("DELETE FROM ingest_ledgers WHERE tbl = ?", (table,))
+        self.conn.commit()
+        self._blooms.pop(table, None)
+        logger.info(f"Ingest index reset for {table}")
+
+    def close(self):
+        self.conn.close()
@@ -1,6 +1,10 @@
 import os
 import pandas as pd
 import logging
+from Sketches import SalesSketches, save_sketches, load_sketches, read_sketch_source
+from Partitioning import write_fact_partitions, load_manifest, FACT_DIR
+from Pipeline_contracts import (FACT_ITEM_COLUMNS, FACT_ORDER_COLUMNS, ORDER_DATE_COLUMNS,
+                                MODELING_REQUIRED_COLUMNS, check_required_columns)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -8,6 +12,8 @@ logger = logging.getLogger(__name__)
 
 STAGING_2 = "staging_2"
 INFO_MART = "Information_Mart"
+PARTITION_SKETCH = "sketch.json"
+SKETCH_COLUMNS = ["order_id", "customer_id", "product_id", "store_id", "quantity", "total_price"]
 os.makedirs(INFO_MART, exist_ok=True)
 
 # -------------------------------
@@ -15,7 +21,8 @@ os.makedirs(INFO_MART, exist_ok=True)
 # -------------------------------
 def load_csv(file, parse_dates=None):
     path = f"{STAGING_2}/{file}"
-    return pd.read_csv(path, parse_dates=parse_dates) if parse_dates else pd.read_csv(path)
+    df = pd.read_csv(path, parse_dates=parse_dates) if parse_dates else pd.read_csv(path)
+    return check_required_columns(df, file, MODELING_REQUIRED_COLUMNS)
 
 def safe_extract_id(df, columns):
     for col in columns:
@@ -31,9 +38,9 @@ def build_dim_table(df, rename_dict=None):
 
 def build_dim_date(orders):
     dates = pd.melt(
-        orders[["order_date", "required_date", "shipped_date"]].reset_index(),
+        orders[ORDER_DATE_COLUMNS].reset_index(),
         id_vars=["index"],
-        value_vars=["order_date", "required_date", "shipped_date"],
+        value_vars=ORDER_DATE_COLUMNS,
         var_name="date_type",
         value_name="date"
     )[["date"]].drop_duplicates().reset_index(drop=True)
@@ -49,8 +56,8 @@ def build_dim_date(orders):
     return dim_date
 
 def build_fact_sales(order_items, orders, products, dim_date):
-    fact = order_items.merge(
-        orders[["order_id", "customer_id", "store_id", "staff_id", "order_date", "shipped_date", "order_status"]],
+    fact = order_items[FACT_ITEM_COLUMNS].merge(
+        orders[FACT_ORDER_COLUMNS],
         on="order_id", how="left"
     ).merge(
         products[["product_id", "local_price", "brand_id", "category_id"]],
@@ -61,12 +68,37 @@ def build_fact_sales(order_items, orders, products, dim_date):
     for col in ["order_date", "shipped_date"]:
         fact = fact.merge(dim_date[["date", "date_id"]].rename(columns={"date": col, "date_id": f"{col}_id"}), on=col, how="left")
     
-    total_revenue = fact["total_price"].sum()
-    avg_order_value = fact.groupby("order_id")["total_price"].sum().mean()
-    
-    logger.info(f"fact_sales: {len(fact):,} records | Total Revenue: {total_revenue:,.2f} EGP | Average Order Value: {avg_order_value:,.2f} EGP")
+    logger.info(f"fact_sales: {len(fact):,} records")
     return fact
 
+def geo_checksum(geo, customer_ids):
+    rows = geo[geo["customer_id"].isin(customer_ids)].sort_values("customer_id")
+    return str(int(pd.util.hash_pandas_object(rows, index=False).sum()))
+
+def build_sales_sketches(customers, mart_dir=INFO_MART):
+    # One sketch per fact partition, kept next to it and rebuilt only when the partition
+    # checksum, or the city/state of a customer it contains, changed; the headline is their merge
+    geo = customers[["customer_id", "city", "state"]]
+    base = os.path.join(mart_dir, FACT_DIR)
+    sketches, partitions, rebuilt = SalesSketches(), load_manifest(mart_dir)["partitions"], 0
+    for p in partitions:
+        path = os.path.join(base, os.path.dirname(p["path"]), PARTITION_SKETCH)
+        source = read_sketch_source(path)
+        if source and source["checksum"] == p["checksum"] and source.get("geo") == geo_checksum(geo, source.get("customers", [])):
+            part = load_sketches(path)
+        else:
+            rows = pd.read_csv(os.path.join(base, p["path"]), usecols=SKETCH_COLUMNS)
+            ids = sorted(int(c) for c in rows["customer_id"].dropna().unique())
+            part = SalesSketches().update(rows.merge(geo, on="customer_id", how="left"))
+            save_sketches(part, path, {"checksum": p["checksum"], "customers": ids, "geo": geo_checksum(geo, ids)})
+            rebuilt += 1
+        sketches.merge(part)
+    logger.info(f"sales sketches: {len(partitions)} partitions, {rebuilt} rebuilt")
+    
+    headline = sketches.summary()
+    logger.info(f"Total Revenue: {headline['total_revenue']:,.2f} EGP | Average Order Value (approx): {headline['approx_average_order_value']:,.2f} EGP")
+    return sketches
+
 def save_tables(tables):
     for name, df in tables.items():
         path = f"{INFO_MART}/{name}.csv"
@@ -81,7 +113,7 @@ def main():
     logger.info("START DATA MODELING (STAR SCHEMA)")
 
     # Load source data
-    orders = load_csv("orders.csv", parse_dates=["order_date", "required_date", "shipped_date"])
+    orders = load_csv("orders.csv", parse_dates=ORDER_DATE_COLUMNS)
     order_items = load_csv("order_items.csv")
     products = load_csv("products.csv")
     customers = load_csv("customers.csv")
@@ -109,9 +141,12 @@ def main():
         "dim_product": dim_product,
         "dim_store": dim_store,
         "dim_staff": dim_staff,
-        "dim_date": dim_date,
-        "fact_sales": fact_sales
+        "dim_date": dim_date
     })
+    write_fact_partitions(fact_sales, INFO_MART)
+    sketches = build_sales_sketches(customers, INFO_MART)
+    save_sketches(sketches, f"{INFO_MART}/sales_sketches.json")
+    logger.info("Saved: sales_sketches.json")
     
     logger.info("DATA MODELING COMPLETED SUCCESSFULLY")
 
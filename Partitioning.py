@@ -0,0 +1,164 @@
+import os
+import json
+import shutil
+import pandas as pd
+import logging
+
+# Logging setup
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INFO_MART = "Information_Mart"
+FACT_DIR = "fact_sales"
+MANIFEST = "_manifest.json"
+PARTITION_DATE = "order_date"
+UNKNOWN = "unknown"   # partition for rows without an order date
+DATE_COLUMNS = ["order_date", "shipped_date"]
+# Columns that get per-partition min/max statistics for pruning
+STATS_COLUMNS = ["order_date", "order_id", "customer_id", "product_id", "store_id", "staff_id", "category_id", "brand_id", "total_price"]
+
+# ---------------------------
+# Writer
+# ---------------------------
+def partition_key(year, month):
+    if pd.isna(year):
+        return f"order_year={UNKNOWN}/order_month={UNKNOWN}"
+    return f"order_year={int(year)}/order_month={int(month):02d}"
+
+def _stat(value):
+    if pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    return value.item() if hasattr(value, "item") else value
+
+def load_manifest(mart_dir=INFO_MART):
+    path = os.path.join(mart_dir, FACT_DIR, MANIFEST)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No partitioned fact_sales at {os.path.dirname(path)}; run Modeling.py first")
+    with open(path) as f:
+        return json.load(f)
+
+def write_fact_partitions(fact, mart_dir=INFO_MART):
+    """Write fact_sales as order_year=/order_month= CSV partitions plus a manifest of min/max stats.
+
+    Partitions whose content is unchanged since the last run are not rewritten.
+    """
+    base = os.path.join(mart_dir, FACT_DIR)
+    os.makedirs(base, exist_ok=True)
+    try:
+        previous = {p["path"]: p for p in load_manifest(mart_dir)["partitions"]}
+    except FileNotFoundError:
+        previous = {}
+
+    dates = pd.to_datetime(fact[PARTITION_DATE], errors="coerce")
+    groups = fact.groupby([dates.dt.year, dates.dt.month], dropna=False, sort=True)
+    partitions, written = [], 0
+    for (year, month), part in groups:
+        key = partition_key(year, month)
+        path = f"{key}/part-0.csv"
+        checksum = str(int(pd.util.hash_pandas_object(part, index=False).sum()))
+        if previous.get(path, {}).get("checksum") != checksum or not os.path.exists(os.path.join(base, path)):
+            os.makedirs(os.path.join(base, key), exist_ok=True)
+            part.to_csv(os.path.join(base, path), index=False)
+            written += 1
+        partitions.append({
+            "path": path,
+            "rows": len(part),
+            "bytes": os.path.getsize(os.path.join(base, path)),
+            "checksum": checksum,
+            "stats": {col: {"min": _stat(part[col].min()), "max": _stat(part[col].max())}
+                      for col in STATS_COLUMNS if col in part.columns},
+        })
+
+    # Drop partitions that no longer exist in the fact
+    for path in set(previous) - {p["path"] for p in partitions}:
+        month_dir = os.path.join(base, os.path.dirname(path))
+        shutil.rmtree(month_dir, ignore_errors=True)
+        year_dir = os.path.dirname(month_dir)
+        if os.path.isdir(year_dir) and not os.listdir(year_dir):
+            os.rmdir(year_dir)
+
+    with open(os.path.join(base, MANIFEST), "w") as f:
+        json.dump({"columns": list(fact.columns), "partitioned_by": ["order_year", "order_month"], "partitions": partitions}, f, indent=1)
+    logger.info(f"Saved: {FACT_DIR}/ ({len(partitions)} partitions, {written} rewritten)")
+
+# ---------------------------
+# Reader
+# ---------------------------
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+def _numeric(col, value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Filter {col}={value!r} is not a number")
+    return int(number) if number.is_integer() else number
+
+def coerce_filters(manifest, filters):
+    """Cast filter values to the type of their column's statistics ("1" -> 1 for an id column)."""
+    coerced = {}
+    for col, wanted in (filters or {}).items():
+        stats = [p["stats"][col]["min"] for p in manifest["partitions"] if p["stats"].get(col, {}).get("min") is not None]
+        numeric = bool(stats) and isinstance(stats[0], (int, float))
+        coerced[col] = [_numeric(col, v) if numeric else v for v in _as_list(wanted)]
+    return coerced
+
+def prune_partitions(manifest, start=None, end=None, filters=None):
+    """Partitions whose min/max statistics can overlap the date range and equality filters."""
+    filters = coerce_filters(manifest, filters)
+    start = pd.Timestamp(start).strftime("%Y-%m-%d") if start else None
+    end = pd.Timestamp(end).strftime("%Y-%m-%d") if end else None
+    kept = []
+    for p in manifest["partitions"]:
+        date = p["stats"].get(PARTITION_DATE, {})
+        if (start or end) and date.get("min") is None:
+            continue
+        if start and date["max"] < start:
+            continue
+        if end and date["min"] > end:
+            continue
+        skip = False
+        for col, wanted in (filters or {}).items():
+            stat = p["stats"].get(col)
+            if not stat or stat["min"] is None:
+                continue
+            if not any(stat["min"] <= v <= stat["max"] for v in wanted):
+                skip = True
+                break
+        if not skip:
+            kept.append(p)
+    return kept
+
+def read_fact_sales(columns=None, start=None, end=None, filters=None, mart_dir=INFO_MART):
+    """Read fact_sales, touching only partitions and columns the query needs.
+
+    `start`/`end` bound order_date (inclusive); `filters` maps a column to a value or
+    list of values. Both are applied to partition statistics first, then to rows.
+    """
+    manifest = load_manifest(mart_dir)
+    filters = coerce_filters(manifest, filters)
+    parts = prune_partitions(manifest, start, end, filters)
+    needed = None
+    if columns is not None:
+        needed = list(dict.fromkeys(list(columns) + list(filters or {}) + ([PARTITION_DATE] if start or end else [])))
+    read_cols = needed or manifest["columns"]
+    parse_dates = [c for c in DATE_COLUMNS if c in read_cols]
+    logger.debug(f"fact_sales: reading {len(parts)}/{len(manifest['partitions'])} partitions")
+
+    base = os.path.join(mart_dir, FACT_DIR)
+    frames = [pd.read_csv(os.path.join(base, p["path"]), usecols=needed, parse_dates=parse_dates) for p in parts]
+    if not frames:
+        return pd.DataFrame(columns=columns or manifest["columns"])
+    fact = pd.concat(frames, ignore_index=True)
+
+    mask = pd.Series(True, index=fact.index)
+    if start:
+        mask &= fact[PARTITION_DATE] >= pd.Timestamp(start)
+    if end:
+        mask &= fact[PARTITION_DATE] <= pd.Timestamp(end)
+    for col, wanted in (filters or {}).items():
+        mask &= fact[col].isin(wanted)
+    fact = fact[mask].reset_index(drop=True)
+    return fact[list(columns)] if columns is not None else fact
@@ -0,0 +1,71 @@
+"""Column and row contracts shared between pipeline stages.
+
+Plain constants and one pure helper: importing this module has no side effects, so Extraction can
+plan its pushdown without importing (and running) the downstream stage scripts.
+"""
+
+# Columns the pipeline itself adds after extraction; never requested from a source
+METADATA_COLS = ["extracted_at", "data_source"]
+
+# Business keys per incremental (fact-grain) table. Dimension snapshots are
+# re-extracted whole on every run and are not key-indexed.
+INGEST_KEYS = {
+    "orders.csv": ["order_id"],
+    "order_items.csv": ["order_id", "item_id"],
+}
+
+# ---------------------------
+# Quality_check row rules
+# ---------------------------
+FILL_NULL_FILES = ["customers.csv", "staffs.csv", "stores.csv"]   # nulls are filled, never dropped
+NOT_NULL_COLUMNS = {"order_items.csv": ["order_id", "product_id"]}  # other files drop any null
+NON_NEGATIVE_COLUMNS = ["list_price", "quantity"]
+
+# Rows the row rules removed at the source, per extracted file (written by Extraction)
+PUSHDOWN_COUNTS_FILE = "_pushdown_counts.json"
+
+# ---------------------------
+# Source columns read by each downstream stage, per file. The stages select and
+# validate their inputs with these lists, so a column a stage starts using has
+# to be added here, and then extraction pulls it too.
+# ---------------------------
+ORDER_DATE_COLUMNS = ["order_date", "required_date", "shipped_date"]
+
+TRANSFORMATION_REQUIRED_COLUMNS = {
+    "products.csv": ["list_price"],
+    "orders.csv": ORDER_DATE_COLUMNS + ["order_status"],
+    "customers.csv": ["city"],
+    "stores.csv": ["city"],
+    "exchange_rates.csv": ["rates"],
+}
+
+# Order columns carried into fact_sales; dim_date additionally reads required_date
+FACT_ORDER_COLUMNS = ["order_id", "customer_id", "store_id", "staff_id", "order_date", "shipped_date", "order_status"]
+ORDER_COLUMNS = list(dict.fromkeys(FACT_ORDER_COLUMNS + ORDER_DATE_COLUMNS))
+# Every order_items column is kept in fact_sales (including the source's
+# Extraction_Date/source lineage), so projection does not narrow this table;
+# only the row rules are pushed down for it.
+FACT_ITEM_COLUMNS = ["order_id", "item_id", "product_id", "quantity", "list_price", "discount",
+                     "Extraction_Date", "source", "extracted_at", "data_source"]
+# "*" = whole table (dimensions are copied as-is)
+MODELING_REQUIRED_COLUMNS = {
+    "orders.csv": ORDER_COLUMNS,
+    "order_items.csv": FACT_ITEM_COLUMNS,
+    "products.csv": "*",
+    "customers.csv": "*",
+    "stores.csv": "*",
+    "staffs.csv": "*",
+}
+
+def check_required_columns(df, file_name, required):
+    """Fail fast, naming the contract, when an input lacks a column the stage declared."""
+    columns = required.get(file_name, [])
+    missing = [c for c in columns if c not in df.columns] if columns != "*" else []
+    if missing:
+        raise KeyError(f"{file_name} is missing {missing} required by Pipeline_contracts")
+    return df
+
+STAGE_REQUIRED_COLUMNS = {
+    "Transformation": TRANSFORMATION_REQUIRED_COLUMNS,
+    "Modeling": MODELING_REQUIRED_COLUMNS,
+}
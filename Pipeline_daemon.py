@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import time
+import runpy
+import argparse
+import logging
+from contextlib import contextmanager
+from Pipeline_contracts import METADATA_COLS, MODELING_REQUIRED_COLUMNS, TRANSFORMATION_REQUIRED_COLUMNS
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Logging setup
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DATA_LAKE_DIR = "DataLake"
+EXTRACT_DIR = "extracted"
+LOCK_FILE = "pipeline.lock"
+STATE_FILE = "pipeline_state.json"
+
+# Stages that run after extraction, in order
+DOWNSTREAM_STAGES = ["Quality_check.py", "Transformation.py", "Modeling.py", "Visualization.py"]
+STAGING_STAGES = ["Quality_check.py", "Transformation.py"]
+# Extracted files the mart is built from; a change to any other file (e.g. stocks)
+# only needs the staging stages
+MART_INPUTS = set(MODELING_REQUIRED_COLUMNS) | set(TRANSFORMATION_REQUIRED_COLUMNS)
+# Columns that change on every pull without changing the data (the API stamps each response)
+FINGERPRINT_IGNORE = {"exchange_rates.csv": ["timestamp"]}
+
+class PipelineLocked(RuntimeError):
+    pass
+
+# ---------------------------
+# Run lock
+# ---------------------------
+@contextmanager
+def pipeline_lock(path=LOCK_FILE):
+    """Exclusive pipeline run lock.
+
+    Held through an OS file lock on a file that is never deleted, so there is no
+    stale-lock detection to race on: the OS drops the lock when its holder exits.
+    The pid written into the file is informational only.
+    """
+    f = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT), "r+")
+    try:
+        try:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            holder = f.read().strip() or "unknown"
+            raise PipelineLocked(f"Pipeline already running (pid {holder}, lock {path})")
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        yield
+    finally:
+        f.close()
+
+# ---------------------------
+# Source watermarks
+# ---------------------------
+def datalake_watermark(settle=0):
+    """(file, mtime, size) for every Data Lake CSV.
+
+    Returns None (skip this poll) while any file was modified within the last
+    `settle` seconds, so a half-written file is never extracted.
+    """
+    if not os.path.exists(DATA_LAKE_DIR):
+        return []
+    now = time.time()
+    marks = []
+    for f in sorted(os.listdir(DATA_LAKE_DIR)):
+        if not f.endswith(".csv"):
+            continue
+        st = os.stat(os.path.join(DATA_LAKE_DIR, f))
+        if now - st.st_mtime < settle:
+            logger.info(f"{f} is still being written; waiting for it to settle")
+            return None
+        marks.append([f, st.st_mtime_ns, st.st_size])
+    return marks
+
+class MySQLWatermark:
+    """Row count and max order_id per source table, polled over one long-lived engine."""
+
+    def __init__(self):
+        self.engine = None
+
+    def __call__(self):
+        import Extraction
+        if not Extraction.DB_HOST:
+            return None
+        from sqlalchemy import text
+        try:
+            if self.engine is None:
+                from sqlalchemy import create_engine
+                self.engine = create_engine(f"mysql+mysqlconnector://{Extraction.DB_USER}:{Extraction.DB_PASS}@{Extraction.DB_HOST}:{Extraction.DB_PORT}/{Extraction.DB_NAME}")
+            with self.engine.connect() as conn:
+                return [list(conn.execute(text(f"SELECT COUNT(*), MAX(order_id) FROM {tbl}")).one()) for tbl in ["orders", "order_items"]]
+        except Exception as e:
+            logger.error(f"MySQL watermark failed: {e}")
+            return None
+
+def api_watermark(refresh):
+    """Time bucket; the exchange rate is re-pulled once per `refresh` seconds."""
+    return int(time.time() // refresh)
+
+# ---------------------------
+# Micro-batch runner
+# ---------------------------
+def load_state(path=STATE_FILE):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+def save_state(state, path=STATE_FILE):
+    with open(path, "w") as f:
+        json.dump(state, f, indent=2)
+
+def run_stage(script):
+    """Run a stage script in-process so pandas, SQLAlchemy and matplotlib stay imported between batches."""
+    logger.info(f"=== Running {script} ===")
+    started = time.perf_counter()
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise RuntimeError(f"{script} exited with status {e.code}")
+    logger.info(f"{script} finished in {time.perf_counter() - started:.1f}s")
+
+def content_fingerprints(extract_dir=None):
+    """Hash of the business content of each extracted file; run metadata (timestamps) is ignored."""
+    extract_dir = extract_dir or EXTRACT_DIR
+    import pandas as pd
+    prints = {}
+    for f in sorted(os.listdir(extract_dir)):
+        if not f.endswith(".csv"):
+            continue
+        df = pd.read_csv(os.path.join(extract_dir, f))
+        ignored = METADATA_COLS + FINGERPRINT_IGNORE.get(f, [])
+        df = df.drop(columns=[c for c in ignored if c in df.columns])
+        prints[f] = str(int(pd.util.hash_pandas_object(df, index=False).sum()))
+    return prints
+
+def affected_stages(changed_files, stages):
+    """Stages that must run for the extracted files whose content changed."""
+    if not changed_files:
+        return []
+    mart = bool(set(changed_files) & MART_INPUTS)
+    return [s for s in stages if s in STAGING_STAGES or mart]
+
+def run_batch(changed, stages, state, extractors=None):
+    """Extract the changed sources, then run only the stages the new content affects.
+
+    A source that fails to extract is logged and left for the next poll, like
+    Extraction.main does; the others still go through. Returns the sources that
+    extracted successfully.
+    """
+    if extractors is None:
+        import Extraction
+        extractors = {"API": Extraction.extract_api, "MySQL": Extraction.extract_mysql, "DataLake": Extraction.extract_datalake}
+    extracted = []
+    for source in changed:
+        logger.info(f"=== Extracting {source} ===")
+        if extractors[source]():
+            extracted.append(source)
+        else:
+            logger.error(f"{source} extraction failed; will retry next interval")
+    prints = content_fingerprints()
+    changed_files = [f for f, h in prints.items() if state.get("content", {}).get(f) != h]
+    to_run = affected_stages(changed_files, stages)
+    if not to_run:
+        logger.info("Extracted content unchanged; no stages to run")
+    for script in to_run:
+        run_stage(script)
+    state["content"] = prints
+    return extracted
+
+def poll(state, args, mysql_watermark):
+    current = {
+        "DataLake": datalake_watermark(args.settle),
+        "MySQL": mysql_watermark(),
+        "API": api_watermark(args.api_refresh),
+    }
+    # An unreachable source (None) is never treated as changed
+    changed = [src for src, mark in current.items() if mark is not None and mark != state.get(src)]
+    return changed, current
+
+def run_daemon(args):
+    stages = [s for s in DOWNSTREAM_STAGES if not (args.skip_visualization and s == "Visualization.py")]
+    state = load_state()
+    mysql_watermark = MySQLWatermark()
+    logger.info(f"Pipeline daemon started (interval {args.interval}s, stages: {', '.join(stages)})")
+    while True:
+        changed, current = poll(state, args, mysql_watermark)
+        if changed:
+            logger.info(f"Micro-batch triggered by: {', '.join(changed)}")
+            try:
+                with pipeline_lock():
+                    extracted = run_batch(changed, stages, state)
+                for src in extracted:
+                    state[src] = current[src]
+                save_state(state)
+                logger.info("Micro-batch completed")
+            except PipelineLocked as e:
+                logger.warning(f"{e}; retrying next interval")
+            except Exception as e:
+                logger.error(f"Micro-batch failed: {e}")
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Keep the ETL pipeline warm and run micro-batches when sources change")
+    parser.add_argument("--interval", type=float, default=float(os.getenv("PIPELINE_INTERVAL", 60)), help="Seconds between source polls")
+    parser.add_argument("--settle", type=float, default=5, help="Skip a poll while any Data Lake file was modified less than this many seconds ago")
+    parser.add_argument("--api-refresh", type=float, default=3600, help="Seconds between exchange-rate pulls")
+    parser.add_argument("--skip-visualization", action="store_true", help="Do not re-render charts on every batch")
+    parser.add_argument("--once", action="store_true", help="Poll once, run a batch if needed, then exit")
+    return parser
+
+if __name__ == "__main__":
+    try:
+        run_daemon(build_parser().parse_args())
+    except KeyboardInterrupt:
+        logger.info("Pipeline daemon stopped")
+        sys.exit(0)
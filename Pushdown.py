@@ -0,0 +1,98 @@
+import os
+import json
+import pandas as pd
+import logging
+from Pipeline_contracts import (INGEST_KEYS, METADATA_COLS, FILL_NULL_FILES, NOT_NULL_COLUMNS,
+                                NON_NEGATIVE_COLUMNS, PUSHDOWN_COUNTS_FILE, STAGE_REQUIRED_COLUMNS)
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Projection
+# ---------------------------
+def required_columns(file_name):
+    """Source columns some downstream stage reads, or None when the whole table is needed.
+
+    Tables no stage declares are copied through staging as-is, so they are read whole.
+    Pipeline metadata columns are added after extraction and never requested from the source.
+    """
+    declared = [required[file_name] for required in STAGE_REQUIRED_COLUMNS.values() if file_name in required]
+    if not declared or "*" in declared:
+        return None
+    columns = list(INGEST_KEYS.get(file_name, []))
+    for cols in declared:
+        columns += cols
+    return [c for c in dict.fromkeys(columns) if c not in METADATA_COLS]
+
+# ---------------------------
+# Predicates (rows Quality_check is guaranteed to drop)
+# ---------------------------
+def not_null_columns(file_name, columns):
+    if file_name in FILL_NULL_FILES:
+        return []
+    if file_name in NOT_NULL_COLUMNS:
+        return NOT_NULL_COLUMNS[file_name]
+    return list(columns or [])
+
+def non_negative_columns(columns):
+    return [c for c in NON_NEGATIVE_COLUMNS if c in (columns or [])]
+
+def _sql_conditions(file_name, columns):
+    not_null = " AND ".join(f"`{c}` IS NOT NULL" for c in not_null_columns(file_name, columns))
+    # NULL >= 0 is not true, matching pandas dropping NaN on the same comparison
+    non_negative = " AND ".join(f"`{c}` >= 0" for c in non_negative_columns(columns))
+    return not_null, non_negative
+
+def build_select(table):
+    """SELECT with the projected columns and a WHERE clause mirroring Quality_check's row rules."""
+    file_name = f"{table}.csv"
+    columns = required_columns(file_name)
+    conditions = [c for c in _sql_conditions(file_name, columns) if c]
+    select = ", ".join(f"`{c}`" for c in columns) if columns else "*"
+    sql = f"SELECT {select} FROM `{table}`"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql
+
+def build_count_select(table):
+    """Counts of the rows build_select leaves behind, split by rule: (nulls_filtered, invalid_filtered)."""
+    file_name = f"{table}.csv"
+    not_null, non_negative = _sql_conditions(file_name, required_columns(file_name))
+    if not (not_null or non_negative):
+        return None
+    not_null = not_null or "1 = 1"
+    nulls = f"SUM(CASE WHEN NOT ({not_null}) THEN 1 ELSE 0 END)"
+    invalid = f"SUM(CASE WHEN ({not_null}) AND NOT COALESCE({non_negative}, 0) THEN 1 ELSE 0 END)" if non_negative else "0"
+    return f"SELECT {nulls}, {invalid} FROM `{table}`"
+
+def read_csv_pushdown(path, file_name):
+    """Read only the needed columns of a CSV and drop rows Quality_check would reject.
+
+    Returns (df, counts) where counts holds the rows dropped per rule.
+    """
+    header = list(pd.read_csv(path, nrows=0).columns)
+    needed = required_columns(file_name)
+    usecols = [c for c in header if c in needed] if needed else header
+    df = pd.read_csv(path, usecols=usecols)[usecols]
+    not_null = df[not_null_columns(file_name, usecols)].notna().all(axis=1)
+    non_negative = pd.Series(True, index=df.index)
+    for col in non_negative_columns(usecols):
+        non_negative &= df[col] >= 0
+    counts = {"nulls_filtered": int((~not_null).sum()), "invalid_filtered": int((not_null & ~non_negative).sum())}
+    df = df[not_null & non_negative]
+    if len(usecols) < len(header) or sum(counts.values()):
+        logger.info(f"Pushdown {file_name}: {len(usecols)}/{len(header)} columns, {sum(counts.values())} rows filtered")
+    return df, counts
+
+# ---------------------------
+# Counts sidecar (merged into the quality report by Quality_check)
+# ---------------------------
+def save_pushdown_counts(extract_dir, file_name, counts):
+    path = os.path.join(extract_dir, PUSHDOWN_COUNTS_FILE)
+    all_counts = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            all_counts = json.load(f)
+    all_counts[file_name] = {k: int(v or 0) for k, v in counts.items()}
+    with open(path, "w") as f:
+        json.dump(all_counts, f, indent=2)
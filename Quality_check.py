@@ -2,6 +2,10 @@ import pandas as pd
 import glob, os
 from datetime import datetime
 import logging
+import json
+from Ingest_index import IngestIndex
+from Pipeline_contracts import (INGEST_KEYS, METADATA_COLS, FILL_NULL_FILES, NOT_NULL_COLUMNS,
+                                NON_NEGATIVE_COLUMNS, PUSHDOWN_COUNTS_FILE)
 
 # Logging setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -18,33 +22,60 @@ quality_metrics = []
 # ---------------------------
 # Helper function
 # ---------------------------
-def save_cleaned(df, file_name):
+def save_cleaned(df, file_name, append=False):
     path = os.path.join(STAGING_DIR, file_name)
-    df.to_csv(path, index=False)
-    logger.info(f"Saved cleaned file: {path} ({len(df)} rows)")
+    if append:
+        # Keep the existing column order so appended rows line up with the header
+        header = pd.read_csv(path, nrows=0).columns
+        df.reindex(columns=header).to_csv(path, mode="a", header=False, index=False)
+        logger.info(f"Appended to cleaned file: {path} ({len(df)} new rows)")
+    else:
+        df.to_csv(path, index=False)
+        logger.info(f"Saved cleaned file: {path} ({len(df)} rows)")
     return path
 
-def clean_csv(file_path):
+def load_pushdown_counts():
+    # Rows Extraction already dropped at the source under the same row rules (see Pushdown.py)
+    path = os.path.join(EXTRACT_DIR, PUSHDOWN_COUNTS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def clean_csv(file_path, index, pushed=None):
     file_name = os.path.basename(file_path)
     df = pd.read_csv(file_path)
-    original_rows = len(df)
+    pushed = pushed or {}
+    filtered_at_source = pushed.get("nulls_filtered", 0) + pushed.get("invalid_filtered", 0)
+    original_rows = len(df) + filtered_at_source
     
-    # Remove duplicates
-    duplicates = df.duplicated().sum()
+    # Remove duplicates (on the business key where known; never on run metadata)
+    subset = INGEST_KEYS.get(file_name) or [c for c in df.columns if c not in METADATA_COLS]
+    duplicates = df.duplicated(subset=subset).sum()
     if duplicates > 0:
-        df = df.drop_duplicates()
+        df = df.drop_duplicates(subset=subset)
+    
+    # Drop rows already loaded by an earlier run. The staging file is the ledger
+    # the index describes, so if either is missing both start over.
+    ledger = os.path.join(STAGING_DIR, file_name)
+    if file_name in INGEST_KEYS:
+        index.recover(file_name, ledger)
+    incremental = file_name in INGEST_KEYS and index.has(file_name) and os.path.exists(ledger)
+    if file_name in INGEST_KEYS and not incremental:
+        index.reset(file_name)
+    df, already_loaded = index.filter_new(file_name, df)
     
     # File-specific null handling
-    nulls_handled = 0
+    nulls_handled = pushed.get("nulls_filtered", 0)
     if file_name == "customers.csv":
         for col in ["phone", "email", "last_name"]:
             nulls_handled += df[col].isnull().sum()
             df[col] = df[col].fillna("Unknown")
-    elif file_name in ["staffs.csv", "stores.csv"]:
+    elif file_name in FILL_NULL_FILES:
         df = df.fillna({"phone":"Unknown", "email":"Unknown", "zip_code":0, "store_id":0, "manager_id":0})
-    elif file_name == "order_items.csv":
+    elif file_name in NOT_NULL_COLUMNS:
         before = len(df)
-        df = df.dropna(subset=["order_id","product_id"])
+        df = df.dropna(subset=NOT_NULL_COLUMNS[file_name])
         nulls_handled += before - len(df)
     else:
         before = len(df)
@@ -52,13 +83,11 @@ def clean_csv(file_path):
         nulls_handled += before - len(df)
     
     # Validation
-    invalid_records = 0
-    if "list_price" in df.columns:
-        invalid_records += (df["list_price"]<0).sum()
-        df = df[df["list_price"]>=0]
-    if "quantity" in df.columns:
-        invalid_records += (df["quantity"]<0).sum()
-        df = df[df["quantity"]>=0]
+    invalid_records = pushed.get("invalid_filtered", 0)
+    for col in NON_NEGATIVE_COLUMNS:
+        if col in df.columns:
+            invalid_records += (df[col]<0).sum()
+            df = df[df[col]>=0]
     
     # Date parsing
     for col in ["order_date","required_date","shipped_date"]:
@@ -72,7 +101,8 @@ def clean_csv(file_path):
     # Metadata & save
     df["extracted_at"] = datetime.now().isoformat()
     df["data_source"] = file_name
-    save_cleaned(df, file_name)
+    ledger = save_cleaned(df, file_name, append=incremental)
+    index.record(file_name, df, ledger)
     
     # Store metrics
     final_rows = len(df)
@@ -84,6 +114,8 @@ def clean_csv(file_path):
         "duplicates_removed": duplicates,
         "nulls_handled": nulls_handled,
         "invalid_records_removed": invalid_records,
+        "already_loaded_skipped": already_loaded,
+        "filtered_at_source": filtered_at_source,
         "data_quality_score": round(100*(1 - total_issues/max(original_rows,1)),2)
     })
 
@@ -105,11 +137,16 @@ def main():
     if not files:
         logger.error("No CSV files found to process!")
         return
-    for f in files:
-        try:
-            clean_csv(f)
-        except Exception as e:
-            logger.error(f"Error processing {f}: {e}")
+    index = IngestIndex()
+    pushdown_counts = load_pushdown_counts()
+    try:
+        for f in files:
+            try:
+                clean_csv(f, index, pushdown_counts.get(os.path.basename(f)))
+            except Exception as e:
+                logger.error(f"Error processing {f}: {e}")
+    finally:
+        index.close()
     generate_report()
     logger.info("=== DATA QUALITY CHECKS COMPLETED ===")
 
@@ -0,0 +1,320 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pandas as pd
+import logging
+from Sketches import load_sketches
+from Partitioning import read_fact_sales
+
+# Logging setup
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INFO_MART = "Information_Mart"
+MART_FILES = ["fact_sales/_manifest.json", "dim_product.csv", "dim_customer.csv", "dim_store.csv"]
+SKETCH_FILE = "sales_sketches.json"
+FACT_COLUMNS = ["order_id", "product_id", "customer_id", "store_id", "category_id", "quantity", "total_price", "order_date"]
+
+CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", 256))
+CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 60))
+
+# Top-N dimensions: name -> (grouping column, label)
+TOP_DIMENSIONS = {
+    "product": "prod_name",
+    "customer": "customer_name",
+    "city": "city",
+    "state": "state",
+    "store": "store_name",
+}
+TOP_METRICS = {"revenue": "total_price", "quantity": "quantity"}
+
+# ---------------------------
+# Result cache
+# ---------------------------
+class ResultCache:
+    """In-memory LRU cache with a per-entry TTL, keyed by query and parameters."""
+
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+# ---------------------------
+# Mart snapshot
+# ---------------------------
+def mart_version(mart_dir=INFO_MART):
+    """Cheap fingerprint of the mart files; changes whenever Modeling.py rewrites them."""
+    version = []
+    for f in MART_FILES:
+        path = os.path.join(mart_dir, f)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No {f} in {mart_dir}; run Modeling.py first")
+        st = os.stat(path)
+        version.append((f, st.st_mtime_ns, st.st_size))
+    return tuple(version)
+
+def load_sales(mart_dir=INFO_MART):
+    fact = read_fact_sales(columns=FACT_COLUMNS, mart_dir=mart_dir)
+    products = pd.read_csv(f"{mart_dir}/dim_product.csv", usecols=["prod_id", "prod_name"])
+    customers = pd.read_csv(f"{mart_dir}/dim_customer.csv", usecols=["cust_id", "cust_first_name", "cust_last_name", "city", "state"])
+    stores = pd.read_csv(f"{mart_dir}/dim_store.csv", usecols=["store_id", "store_name"])
+
+    sales = fact.merge(products, left_on="product_id", right_on="prod_id", how="left").drop("prod_id", axis=1)
+    sales = sales.merge(customers, left_on="customer_id", right_on="cust_id", how="left").drop("cust_id", axis=1)
+    sales = sales.merge(stores, on="store_id", how="left")
+    sales["customer_name"] = sales["cust_first_name"] + " " + sales["cust_last_name"]
+    return sales
+
+class MartQueryService:
+    """Answers KPI and top-N queries from the Information_Mart, caching results per mart version."""
+
+    def __init__(self, mart_dir=INFO_MART, cache=None):
+        self.mart_dir = mart_dir
+        self.cache = cache or ResultCache()
+        self._lock = threading.Lock()
+        self._version = None
+        self._sales = None
+
+    def snapshot(self):
+        """(version, sales) of the current mart, reloading it when Modeling wrote a new one."""
+        version = mart_version(self.mart_dir)
+        with self._lock:
+            if version != self._version:
+                logger.info("Loading mart version from %s", self.mart_dir)
+                self._sales = load_sales(self.mart_dir)
+                self._version = version
+                self.cache.clear()
+            return self._version, self._sales
+
+    def _cached(self, key, compute):
+        # The version is part of the key, so a result computed from an older
+        # snapshot can never be served once a newer one is loaded.
+        version, sales = self.snapshot()
+        key = (version,) + key
+        result = self.cache.get(key)
+        if result is None:
+            result = compute(sales)
+            self.cache.put(key, result)
+        return result
+
+    def kpis(self, start=None, end=None, store_id=None, category_id=None):
+        key = ("kpis", start, end, store_id, category_id)
+        return self._cached(key, lambda s: compute_kpis(filter_sales(s, start, end, store_id, category_id)))
+
+    def headline(self, n=10):
+        """Unfiltered headline metrics straight from the sketches Modeling saves; no fact scan."""
+        path = os.path.join(self.mart_dir, SKETCH_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No sales sketches at {path}; run Modeling.py first")
+        key = ("headline", os.stat(path).st_mtime_ns, n)
+        result = self.cache.get(key)
+        if result is None:
+            result = load_sketches(path).summary(n)
+            self.cache.put(key, result)
+        return result
+
+    def top_n(self, by="product", metric="revenue", n=10, start=None, end=None, store_id=None, category_id=None):
+        if by not in TOP_DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{by}', expected one of {sorted(TOP_DIMENSIONS)}")
+        if metric not in TOP_METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {sorted(TOP_METRICS)}")
+        key = ("top_n", by, metric, n, start, end, store_id, category_id)
+        return self._cached(key, lambda s: compute_top_n(filter_sales(s, start, end, store_id, category_id), by, metric, n))
+
+# ---------------------------
+# Queries
+# ---------------------------
+def filter_sales(sales, start=None, end=None, store_id=None, category_id=None):
+    mask = pd.Series(True, index=sales.index)
+    if start:
+        mask &= sales["order_date"] >= pd.Timestamp(start)
+    if end:
+        mask &= sales["order_date"] <= pd.Timestamp(end)
+    if store_id is not None:
+        mask &= sales["store_id"] == store_id
+    if category_id is not None:
+        mask &= sales["category_id"] == category_id
+    return sales[mask]
+
+def compute_kpis(sales):
+    orders = sales.groupby("order_id")["total_price"].sum()
+    return {
+        "total_revenue": round(float(sales["total_price"].sum()), 2),
+        "total_orders": int(len(orders)),
+        "total_items": int(len(sales)),
+        "total_quantity": int(sales["quantity"].sum()),
+        "unique_customers": int(sales["customer_id"].nunique()),
+        "unique_products": int(sales["product_id"].nunique()),
+        "average_order_value": round(float(orders.mean()), 2) if len(orders) else 0.0,
+        "date_from": sales["order_date"].min().strftime("%Y-%m-%d") if len(sales) else None,
+        "date_to": sales["order_date"].max().strftime("%Y-%m-%d") if len(sales) else None,
+    }
+
+def compute_top_n(sales, by, metric, n):
+    col, value = TOP_DIMENSIONS[by], TOP_METRICS[metric]
+    top = sales.groupby(col)[value].sum().nlargest(n)
+    return [{by: name, metric: round(float(v), 2)} for name, v in top.items()]
+
+# ---------------------------
+# HTTP service
+# ---------------------------
+def parse_date(value):
+    """Normalise a YYYY-MM-DD filter date; raises ValueError on anything else."""
+    try:
+        return pd.Timestamp(value).strftime("%Y-%m-%d")
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+def parse_filters(params):
+    def one(name, cast=str):
+        v = params.get(name)
+        return cast(v[0]) if v else None
+    return {
+        "start": one("start", parse_date),
+        "end": one("end", parse_date),
+        "store_id": one("store", int),
+        "category_id": one("category", int),
+    }
+
+def make_handler(service):
+    class QueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            try:
+                filters = parse_filters(params)
+                if url.path == "/kpis":
+                    body = service.kpis(**filters)
+                elif url.path == "/top":
+                    by = params.get("by", ["product"])[0]
+                    metric = params.get("metric", ["revenue"])[0]
+                    n = int(params.get("n", [10])[0])
+                    body = service.top_n(by, metric, n, **filters)
+                elif url.path == "/headline":
+                    body = service.headline(int(params.get("n", [10])[0]))
+                elif url.path == "/stats":
+                    body = service.cache.stats()
+                else:
+                    return self._send(404, {"error": f"Unknown endpoint {url.path}"})
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            except FileNotFoundError as e:
+                # The mart (or its sketches) has not been built yet
+                return self._send(503, {"error": str(e)})
+            except Exception as e:
+                logger.error(f"Query failed: {e}")
+                return self._send(500, {"error": str(e)})
+            self._send(200, body)
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, fmt, *args):
+            logger.debug(fmt, *args)
+
+    return QueryHandler
+
+def serve(service, host="127.0.0.1", port=8050):
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    logger.info(f"Query service listening on http://{host}:{port} (endpoints: /kpis, /top, /headline, /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# ---------------------------
+# CLI
+# ---------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(description="KPI and top-N queries over the Information_Mart")
+    parser.add_argument("--mart-dir", default=INFO_MART)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def date_arg(value):
+        try:
+            return parse_date(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    def add_filters(p):
+        p.add_argument("--start", type=date_arg, help="Order date from (YYYY-MM-DD, inclusive)")
+        p.add_argument("--end", type=date_arg, help="Order date to (YYYY-MM-DD, inclusive)")
+        p.add_argument("--store", type=int, dest="store_id")
+        p.add_argument("--category", type=int, dest="category_id")
+
+    add_filters(sub.add_parser("kpis", help="Headline KPIs"))
+    top = sub.add_parser("top", help="Top-N by revenue or quantity")
+    top.add_argument("--by", choices=sorted(TOP_DIMENSIONS), default="product")
+    top.add_argument("--metric", choices=sorted(TOP_METRICS), default="revenue")
+    top.add_argument("-n", type=int, default=10)
+    add_filters(top)
+    headline = sub.add_parser("headline", help="Approximate headline metrics from the saved sketches")
+    headline.add_argument("-n", type=int, default=10)
+    srv = sub.add_parser("serve", help="Run the local HTTP query service")
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8050)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    service = MartQueryService(args.mart_dir)
+    if args.command == "serve":
+        serve(service, args.host, args.port)
+        return
+    try:
+        if args.command == "headline":
+            result = service.headline(args.n)
+        else:
+            filters = dict(start=args.start, end=args.end, store_id=args.store_id, category_id=args.category_id)
+            if args.command == "kpis":
+                result = service.kpis(**filters)
+            else:
+                result = service.top_n(args.by, args.metric, args.n, **filters)
+    except FileNotFoundError as e:
+        sys.exit(f"Error: {e}")
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
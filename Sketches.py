@@ -0,0 +1,327 @@
+import os
+import json
+import math
+import zlib
+import base64
+import argparse
+import numpy as np
+import pandas as pd
+import logging
+
+# Logging setup
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INFO_MART = "Information_Mart"
+SKETCH_FILE = f"{INFO_MART}/sales_sketches.json"
+
+HLL_PRECISION = 14        # 16384 registers, ~0.8% standard error
+TOPK_CAPACITY = 200       # counters kept per heavy-hitter summary
+TDIGEST_COMPRESSION = 200
+TDIGEST_EXACT_LIMIT = 1000   # distinct values kept exactly before centroids start to merge
+
+# ---------------------------
+# Hashing
+# ---------------------------
+def hash_values(values):
+    """Stable 64-bit hashes; integral floats (ids after a left merge) hash like ints."""
+    s = pd.Series(values).dropna()
+    if s.dtype.kind == "f" and (s % 1 == 0).all():
+        s = s.astype("int64")
+    return pd.util.hash_pandas_object(s, index=False).to_numpy(dtype=np.uint64)
+
+def _key(value):
+    # JSON-safe counter key; 259.0 and 259 are the same id
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+# ---------------------------
+# HyperLogLog
+# ---------------------------
+class HyperLogLog:
+    """Distinct-count sketch; merge is an element-wise max of registers."""
+
+    def __init__(self, p=HLL_PRECISION, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8) if registers is None else np.asarray(registers, dtype=np.uint8)
+
+    def update(self, values):
+        h = hash_values(values)
+        if not len(h):
+            return
+        idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = (h & np.uint64((1 << (64 - self.p)) - 1)).astype(np.float64)  # < 2**50, exact in float64
+        bitlen = np.where(rest > 0, np.frexp(rest)[1], 0)
+        rank = (64 - self.p - bitlen + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+    def to_dict(self):
+        # Registers of a small partition are mostly zero and compress to a few bytes
+        return {"p": self.p, "registers": base64.b64encode(zlib.compress(self.registers.tobytes())).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["p"], np.frombuffer(zlib.decompress(base64.b64decode(d["registers"])), dtype=np.uint8).copy())
+
+# ---------------------------
+# Space-Saving heavy hitters
+# ---------------------------
+class SpaceSaving:
+    """Weighted Space-Saving top-K summary with at most `capacity` counters.
+
+    Each counter is (count, error): the true total lies in [count - error, count].
+    Two summaries merge by adding counts, charging keys missing from a full summary
+    with that summary's minimum count, and keeping the `capacity` largest.
+    """
+
+    def __init__(self, capacity=TOPK_CAPACITY, counters=None):
+        self.capacity = capacity
+        self.counters = counters or {}
+
+    def _floor(self):
+        if len(self.counters) < self.capacity:
+            return 0.0
+        return min(c for c, _ in self.counters.values())
+
+    def update(self, keys, weights):
+        batch = pd.Series(np.asarray(weights, dtype=float), index=pd.Index(keys)).groupby(level=0).sum()
+        # The batch is an exact summary: never full, so absent keys are charged nothing
+        exact = SpaceSaving(capacity=len(batch) + 1,
+                            counters={_key(k): (float(w), 0.0) for k, w in batch.items()})
+        return self.merge(exact)
+
+    def merge(self, other):
+        floor_a, floor_b = self._floor(), other._floor()
+        merged = {}
+        for k in set(self.counters) | set(other.counters):
+            ca, ea = self.counters.get(k, (floor_a, floor_a))
+            cb, eb = other.counters.get(k, (floor_b, floor_b))
+            merged[k] = (ca + cb, ea + eb)
+        top = sorted(merged.items(), key=lambda kv: kv[1][0], reverse=True)[:self.capacity]
+        self.counters = dict(top)
+        return self
+
+    def top(self, n=10):
+        ranked = sorted(self.counters.items(), key=lambda kv: kv[1][0], reverse=True)[:n]
+        return [{"key": k, "value": round(c, 2), "error": round(e, 2)} for k, (c, e) in ranked]
+
+    def to_dict(self):
+        return {"capacity": self.capacity, "counters": {k: list(v) for k, v in self.counters.items()}}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["capacity"], {k: tuple(v) for k, v in d["counters"].items()})
+
+# ---------------------------
+# t-digest
+# ---------------------------
+class TDigest:
+    """Merging t-digest for quantiles, using the arcsine (k1) scale function.
+
+    Equal values always share one centroid. While there are at most `exact_limit`
+    distinct values the digest is an exact histogram and quantiles match pandas'
+    linear interpolation; past that, centroids are merged on the k1 scale.
+    """
+
+    def __init__(self, compression=TDIGEST_COMPRESSION, means=None, weights=None, vmin=None, vmax=None,
+                 exact=True, exact_limit=TDIGEST_EXACT_LIMIT):
+        self.compression = compression
+        self.exact_limit = exact_limit
+        self.means = np.asarray(means if means is not None else [], dtype=float)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=float)
+        self.vmin, self.vmax = vmin, vmax
+        self.exact = exact
+
+    def _absorb(self, means, weights, exact):
+        values, inverse = np.unique(means, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights)
+        self.exact = exact and len(values) <= self.exact_limit
+        if self.exact:
+            self.means, self.weights = values, counts
+        else:
+            self._compress(values, counts)
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(2 * q_left - 1)
+        bins = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        w = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / w
+        self.weights = w
+
+    def update(self, values):
+        values = pd.Series(values).dropna().to_numpy(dtype=float)
+        if not len(values):
+            return
+        self.vmin = float(values.min()) if self.vmin is None else min(self.vmin, float(values.min()))
+        self.vmax = float(values.max()) if self.vmax is None else max(self.vmax, float(values.max()))
+        self._absorb(np.r_[self.means, values], np.r_[self.weights, np.ones(len(values))], self.exact)
+
+    def merge(self, other):
+        if not len(other.weights):
+            return self
+        self.vmin = other.vmin if self.vmin is None else min(self.vmin, other.vmin)
+        self.vmax = other.vmax if self.vmax is None else max(self.vmax, other.vmax)
+        self._absorb(np.r_[self.means, other.means], np.r_[self.weights, other.weights], self.exact and other.exact)
+        return self
+
+    def quantile(self, q):
+        if not len(self.weights):
+            return None
+        if self.exact:
+            cum = np.cumsum(self.weights)
+            rank = q * (cum[-1] - 1)
+            lo = self.means[np.searchsorted(cum, math.floor(rank), side="right")]
+            hi = self.means[np.searchsorted(cum, math.ceil(rank), side="right")]
+            return float(lo + (rank - math.floor(rank)) * (hi - lo))
+        centers = np.cumsum(self.weights) - self.weights / 2
+        total = self.weights.sum()
+        xs = np.r_[0.0, centers, total]
+        ys = np.r_[self.vmin, self.means, self.vmax]
+        return float(np.interp(q * total, xs, ys))
+
+    def to_dict(self):
+        return {"compression": self.compression, "means": self.means.tolist(), "weights": self.weights.tolist(),
+                "min": self.vmin, "max": self.vmax, "exact": self.exact}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["compression"], d["means"], d["weights"], d["min"], d["max"], d["exact"])
+
+# ---------------------------
+# Sales sketches
+# ---------------------------
+# name -> fact column
+DISTINCT_SKETCHES = {"orders": "order_id", "customers": "customer_id", "products": "product_id"}
+# name -> (key column, weight column)
+TOP_SKETCHES = {
+    "product_revenue": ("product_id", "total_price"),
+    "product_quantity": ("product_id", "quantity"),
+    "customer_revenue": ("customer_id", "total_price"),
+    "store_revenue": ("store_id", "total_price"),
+    "city_revenue": ("city", "total_price"),
+    "state_revenue": ("state", "total_price"),
+}
+# name -> fact column
+QUANTILE_SKETCHES = {"line_value": "total_price"}
+
+class SalesSketches:
+    """Bounded-memory headline metrics over fact_sales, fed one batch at a time and mergeable."""
+
+    def __init__(self):
+        self.rows = 0
+        self.revenue = 0.0
+        self.quantity = 0
+        self.distinct = {name: HyperLogLog() for name in DISTINCT_SKETCHES}
+        self.top = {name: SpaceSaving() for name in TOP_SKETCHES}
+        self.quantiles = {name: TDigest() for name in QUANTILE_SKETCHES}
+
+    def update(self, batch):
+        """Feed one fact batch; summaries whose columns are missing from the batch are skipped."""
+        self.rows += len(batch)
+        self.revenue += float(batch["total_price"].sum())
+        self.quantity += int(batch["quantity"].sum())
+        for name, col in DISTINCT_SKETCHES.items():
+            if col in batch.columns:
+                self.distinct[name].update(batch[col])
+        for name, (key, weight) in TOP_SKETCHES.items():
+            if key in batch.columns:
+                rows = batch[[key, weight]].dropna()
+                self.top[name].update(rows[key].to_numpy(), rows[weight].to_numpy())
+        for name, col in QUANTILE_SKETCHES.items():
+            self.quantiles[name].update(batch[col])
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.revenue += other.revenue
+        self.quantity += other.quantity
+        for name in self.distinct:
+            self.distinct[name].merge(other.distinct[name])
+        for name in self.top:
+            self.top[name].merge(other.top[name])
+        for name in self.quantiles:
+            self.quantiles[name].merge(other.quantiles[name])
+        return self
+
+    def summary(self, n=10):
+        orders = self.distinct["orders"].count()
+        line = self.quantiles["line_value"]
+        return {
+            "rows": self.rows,
+            "total_revenue": round(self.revenue, 2),
+            "total_quantity": self.quantity,
+            "approx_orders": orders,
+            "approx_customers": self.distinct["customers"].count(),
+            "approx_products": self.distinct["products"].count(),
+            "approx_average_order_value": round(self.revenue / orders, 2) if orders else 0.0,
+            "mean_line_value": round(self.revenue / self.rows, 2) if self.rows else 0.0,
+            "approx_median_line_value": line.quantile(0.5),
+            "approx_p90_line_value": line.quantile(0.9),
+            "approx_p99_line_value": line.quantile(0.99),
+            "top": {name: s.top(n) for name, s in self.top.items()},
+        }
+
+    def to_dict(self):
+        return {
+            "rows": self.rows, "revenue": self.revenue, "quantity": self.quantity,
+            "distinct": {k: v.to_dict() for k, v in self.distinct.items()},
+            "top": {k: v.to_dict() for k, v in self.top.items()},
+            "quantiles": {k: v.to_dict() for k, v in self.quantiles.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        s = cls()
+        s.rows, s.revenue, s.quantity = d["rows"], d["revenue"], d["quantity"]
+        s.distinct.update({k: HyperLogLog.from_dict(v) for k, v in d["distinct"].items()})
+        s.top.update({k: SpaceSaving.from_dict(v) for k, v in d["top"].items()})
+        s.quantiles.update({k: TDigest.from_dict(v) for k, v in d["quantiles"].items()})
+        return s
+
+def save_sketches(sketches, path=SKETCH_FILE, source=None):
+    """Save sketches as JSON; `source` records what they were built from (see read_sketch_source)."""
+    d = sketches.to_dict()
+    if source is not None:
+        d["source"] = source
+    with open(path, "w") as f:
+        json.dump(d, f)
+    logger.debug(f"Saved: {path}")
+
+def load_sketches(path=SKETCH_FILE):
+    with open(path) as f:
+        return SalesSketches.from_dict(json.load(f))
+
+def read_sketch_source(path):
+    """The `source` saved with a sketch file, or None when the file is missing or has none."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f).get("source")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print headline sales metrics from the saved sketches")
+    parser.add_argument("--path", default=SKETCH_FILE)
+    parser.add_argument("-n", type=int, default=10)
+    args = parser.parse_args()
+    if not os.path.exists(args.path):
+        raise SystemExit(f"Error: no sales sketches at {args.path}; run Modeling.py first")
+    print(json.dumps(load_sketches(args.path).summary(args.n), indent=2))
@@ -2,6 +2,7 @@ import os
 import pandas as pd
 import json, ast
 import logging
+from Pipeline_contracts import ORDER_DATE_COLUMNS, TRANSFORMATION_REQUIRED_COLUMNS, check_required_columns
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ def transform_products(df, rate):
     return df
 
 def transform_orders(df):
-    for col in ["order_date","required_date","shipped_date"]:
+    for col in ORDER_DATE_COLUMNS:
         df[col] = pd.to_datetime(df[col])
     df["delivery_latency_days"] = (df["shipped_date"]-df["order_date"]).dt.days
     df["late_delivery"] = ((df["shipped_date"]-df["required_date"]).dt.days>0).astype(int)
@@ -47,12 +48,16 @@ def copy_remaining():
         if f.endswith(".csv") and f not in transformed:
             pd.read_csv(f"{STAGING_1}/{f}").to_csv(f"{STAGING_2}/{f}", index=False)
 
+def load_staged(file):
+    # Extraction only pulls the columns declared in Pipeline_contracts
+    return check_required_columns(pd.read_csv(f"{STAGING_1}/{file}"), file, TRANSFORMATION_REQUIRED_COLUMNS)
+
 def main():
-    products = pd.read_csv(f"{STAGING_1}/products.csv")
-    orders = pd.read_csv(f"{STAGING_1}/orders.csv")
-    customers = pd.read_csv(f"{STAGING_1}/customers.csv")
-    stores = pd.read_csv(f"{STAGING_1}/stores.csv")
-    exchange_rates = pd.read_csv(f"{STAGING_1}/exchange_rates.csv")
+    products = load_staged("products.csv")
+    orders = load_staged("orders.csv")
+    customers = load_staged("customers.csv")
+    stores = load_staged("stores.csv")
+    exchange_rates = load_staged("exchange_rates.csv")
 
     rate = safe_rate(exchange_rates)
     products = transform_products(products, rate)
@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 import warnings
+from Partitioning import read_fact_sales
 warnings.filterwarnings('ignore')
 
 # Setup
@@ -20,7 +21,7 @@ print("="*60 + "\n")
 # ============================================
 print("Step 1: Loading data files...")
 try:
-    fact_sales = pd.read_csv("Information_Mart/fact_sales.csv")
+    fact_sales = read_fact_sales(columns=['product_id', 'customer_id', 'order_date_id', 'quantity', 'total_price'])
     dim_product = pd.read_csv("Information_Mart/dim_product.csv")
     dim_customer = pd.read_csv("Information_Mart/dim_customer.csv")
     dim_date = pd.read_csv("Information_Mart/dim_date.csv", parse_dates=['date'])
@@ -1,5 +1,6 @@
 import subprocess
 import sys
+from Pipeline_daemon import pipeline_lock, PipelineLocked
 
 # List of scripts to run in order
 scripts = [
@@ -10,18 +11,27 @@ scripts = [
     "Visualization.py"
 ]
 
-for script in scripts:
-    print(f"\n=== Running {script} ===")
-    result = subprocess.run([sys.executable, script], capture_output=True, text=True)
-    
-    # Print script output
-    print(result.stdout)
-    if result.stderr:
-        print(f"Errors in {script}:\n{result.stderr}")
-    
-    # Stop execution if a script fails
-    if result.returncode != 0:
-        print(f"{script} failed. Stopping execution.")
-        break
-else:
-    print("\nAll scripts ran successfully!")
+def run_scripts():
+    for script in scripts:
+        print(f"\n=== Running {script} ===")
+        result = subprocess.run([sys.executable, script], capture_output=True, text=True)
+        
+        # Print script output
+        print(result.stdout)
+        if result.stderr:
+            print(f"Errors in {script}:\n{result.stderr}")
+        
+        # Stop execution if a script fails
+        if result.returncode != 0:
+            print(f"{script} failed. Stopping execution.")
+            break
+    else:
+        print("\nAll scripts ran successfully!")
+
+# Hold the same lock as the pipeline daemon so runs never overlap
+try:
+    with pipeline_lock():
+        run_scripts()
+except PipelineLocked as e:
+    print(f"{e}. Stopping execution.")
+    sys.exit(1)
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def mart_dir():
+    """The committed Information_Mart, used as a reference data set."""
+    return os.path.join(ROOT, "Information_Mart")
@@ -0,0 +1,133 @@
+import os
+
+import pandas as pd
+import pytest
+
+from Ingest_index import BloomFilter, IngestIndex, normalize_key
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = IngestIndex(str(tmp_path / "ingest_index.db"))
+    yield idx
+    idx.close()
+
+
+def write_ledger(path, df, append=False):
+    df.to_csv(path, mode="a" if append else "w", header=not append, index=False)
+    return str(path)
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"k{i}")
+    assert all(f"k{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"other{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_bloom_filter_round_trips_through_bytes():
+    bloom = BloomFilter(capacity=100)
+    bloom.add("1|2")
+    copy = BloomFilter(bits=bloom.bits, hashes=bloom.hashes, data=bytes(bloom.data))
+    assert "1|2" in copy
+
+
+def test_normalize_key_matches_modeling_id_cleaning():
+    assert normalize_key([1.0, "b'8'"]) == normalize_key(["1", 8]) == "1|8"
+
+
+def test_replayed_rows_are_dropped(index, tmp_path):
+    batch = pd.DataFrame({"order_id": [1, 1, 2], "item_id": [1, 2, 1], "quantity": [1, 2, 3]})
+    ledger = write_ledger(tmp_path / "order_items.csv", batch)
+    index.record("order_items.csv", batch, ledger)
+
+    replay = pd.DataFrame({"order_id": [1.0, 2.0, 3.0], "item_id": [2, 1, 1], "quantity": [2, 3, 4]})
+    new, dropped = index.filter_new("order_items.csv", replay)
+    assert dropped == 2
+    assert new["order_id"].tolist() == [3.0]
+
+
+def test_index_persists_across_instances(tmp_path):
+    path = str(tmp_path / "ingest_index.db")
+    batch = pd.DataFrame({"order_id": [10, 11]})
+    first = IngestIndex(path)
+    first.record("orders.csv", batch, write_ledger(tmp_path / "orders.csv", batch))
+    first.close()
+
+    second = IngestIndex(path)
+    assert second.has("orders.csv")
+    assert second.filter_new("orders.csv", batch)[1] == 2
+    second.close()
+
+
+def test_uncommitted_append_is_rolled_back(index, tmp_path):
+    ledger = tmp_path / "orders.csv"
+    batch = pd.DataFrame({"order_id": [1, 2]})
+    index.record("orders.csv", batch, write_ledger(ledger, batch))
+    committed = os.path.getsize(ledger)
+
+    # A run appends rows and dies before recording their keys
+    write_ledger(ledger, pd.DataFrame({"order_id": [3]}), append=True)
+    index.recover("orders.csv", str(ledger))
+
+    assert os.path.getsize(ledger) == committed
+    assert pd.read_csv(ledger)["order_id"].tolist() == [1, 2]
+    assert index.filter_new("orders.csv", pd.DataFrame({"order_id": [3]}))[1] == 0
+
+
+def test_replaced_ledger_resets_the_index(index, tmp_path):
+    ledger = tmp_path / "orders.csv"
+    batch = pd.DataFrame({"order_id": [1, 2, 3]})
+    index.record("orders.csv", batch, write_ledger(ledger, batch))
+    write_ledger(ledger, pd.DataFrame({"order_id": [1]}))
+
+    index.recover("orders.csv", str(ledger))
+    assert not index.has("orders.csv")
+
+
+def test_overfull_bloom_filter_is_rebuilt(index, tmp_path, caplog):
+    index._blooms["orders.csv"] = BloomFilter(capacity=5)
+    batch = pd.DataFrame({"order_id": range(50)})
+    index.record("orders.csv", batch, write_ledger(tmp_path / "orders.csv", batch))
+    assert "exceed the Bloom filter capacity" in caplog.text
+    assert index.bloom("orders.csv").capacity > 50
+    assert index.filter_new("orders.csv", batch)[1] == 50
+
+
+@pytest.fixture
+def quality_check(tmp_path, monkeypatch):
+    import Quality_check
+    monkeypatch.setattr(Quality_check, "STAGING_DIR", str(tmp_path / "staging_1"))
+    monkeypatch.setattr(Quality_check, "quality_metrics", [])
+    os.makedirs(tmp_path / "staging_1")
+    return Quality_check
+
+
+def test_clean_csv_loads_each_extract_once(quality_check, index, tmp_path):
+    extract = os.path.join(ROOT, "extracted", "orders.csv")
+    staged = tmp_path / "staging_1" / "orders.csv"
+    quality_check.clean_csv(extract, index)
+    loaded = len(pd.read_csv(staged))
+    size = os.path.getsize(staged)
+
+    quality_check.clean_csv(extract, index)
+    second = quality_check.quality_metrics[-1]
+    assert os.path.getsize(staged) == size
+    assert second["already_loaded_skipped"] == loaded
+    assert second["final_rows"] == 0
+
+
+def test_clean_csv_rewrites_when_staging_file_is_missing(quality_check, index, tmp_path):
+    extract = os.path.join(ROOT, "extracted", "orders.csv")
+    staged = tmp_path / "staging_1" / "orders.csv"
+    quality_check.clean_csv(extract, index)
+    loaded = len(pd.read_csv(staged))
+    os.remove(staged)
+
+    quality_check.clean_csv(extract, index)
+    assert len(pd.read_csv(staged)) == loaded
+    assert quality_check.quality_metrics[-1]["already_loaded_skipped"] == 0
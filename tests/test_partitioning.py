@@ -0,0 +1,88 @@
+import os
+
+import pandas as pd
+import pytest
+
+from Partitioning import FACT_DIR, load_manifest, prune_partitions, read_fact_sales, write_fact_partitions
+
+
+@pytest.fixture(scope="module")
+def full(mart_dir):
+    return read_fact_sales(mart_dir=mart_dir)
+
+
+def test_date_range_prunes_to_matching_months(mart_dir):
+    parts = prune_partitions(load_manifest(mart_dir), start="2017-03-01", end="2017-04-30")
+    assert [p["path"] for p in parts] == ["order_year=2017/order_month=03/part-0.csv",
+                                          "order_year=2017/order_month=04/part-0.csv"]
+
+
+def test_unbounded_read_covers_every_row(mart_dir, full):
+    manifest = load_manifest(mart_dir)
+    assert len(full) == sum(p["rows"] for p in manifest["partitions"])
+    assert list(full.columns) == manifest["columns"]
+
+
+@pytest.mark.parametrize("start,end,filters", [
+    ("2017-03-15", "2017-06-10", None),
+    (None, "2016-12-31", {"store_id": 2}),
+    ("2016-06-01", None, {"category_id": [1, 3], "store_id": [1, 3]}),
+    (None, None, {"product_id": 7}),
+])
+def test_pruned_read_matches_pandas_filter(mart_dir, full, start, end, filters):
+    columns = ["order_id", "product_id", "total_price"]
+    got = read_fact_sales(columns=columns, start=start, end=end, filters=filters, mart_dir=mart_dir)
+    mask = pd.Series(True, index=full.index)
+    if start:
+        mask &= full["order_date"] >= pd.Timestamp(start)
+    if end:
+        mask &= full["order_date"] <= pd.Timestamp(end)
+    for col, wanted in (filters or {}).items():
+        mask &= full[col].isin(wanted if isinstance(wanted, list) else [wanted])
+    expected = full.loc[mask, columns].reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_equality_filter_skips_partitions_by_stats(mart_dir):
+    manifest = load_manifest(mart_dir)
+    kept = prune_partitions(manifest, filters={"order_id": 1})
+    assert 0 < len(kept) < len(manifest["partitions"])
+
+
+def sample_fact():
+    return pd.DataFrame({
+        "order_id": [1, 2, 3, 4],
+        "order_date": pd.to_datetime(["2020-01-05", "2020-01-20", "2020-02-03", None]),
+        "total_price": [10.0, 20.0, 30.0, 40.0],
+    })
+
+
+def test_writer_skips_unchanged_and_removes_stale_partitions(tmp_path):
+    fact = sample_fact()
+    write_fact_partitions(fact, str(tmp_path))
+    base = tmp_path / FACT_DIR
+    assert sorted(p["path"] for p in load_manifest(str(tmp_path))["partitions"]) == [
+        "order_year=2020/order_month=01/part-0.csv",
+        "order_year=2020/order_month=02/part-0.csv",
+        "order_year=unknown/order_month=unknown/part-0.csv",
+    ]
+    january = base / "order_year=2020" / "order_month=01" / "part-0.csv"
+    os.utime(january, ns=(0, 0))
+
+    # February changes, the undated row goes away, January is untouched
+    fact = fact.iloc[:3].copy()
+    fact.loc[2, "total_price"] = 31.0
+    write_fact_partitions(fact, str(tmp_path))
+    assert january.stat().st_mtime_ns == 0
+    assert not (base / "order_year=unknown").exists()
+    read = read_fact_sales(mart_dir=str(tmp_path))
+    assert read["total_price"].tolist() == [10.0, 20.0, 31.0]
+
+
+def test_filter_values_are_cast_to_the_column_type(mart_dir):
+    as_int = read_fact_sales(columns=["order_id"], filters={"store_id": 1}, mart_dir=mart_dir)
+    as_str = read_fact_sales(columns=["order_id"], filters={"store_id": "1"}, mart_dir=mart_dir)
+    assert len(as_int) > 0
+    pd.testing.assert_frame_equal(as_str, as_int)
+    with pytest.raises(ValueError, match="store_id"):
+        read_fact_sales(filters={"store_id": "one"}, mart_dir=mart_dir)
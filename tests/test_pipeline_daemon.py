@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+import Pipeline_daemon
+from Pipeline_daemon import PipelineLocked, affected_stages, datalake_watermark, pipeline_lock
+
+STAGES = Pipeline_daemon.DOWNSTREAM_STAGES
+
+
+def test_lock_is_exclusive_and_file_persists(tmp_path):
+    path = str(tmp_path / "pipeline.lock")
+    with pipeline_lock(path):
+        with pytest.raises(PipelineLocked):
+            with pipeline_lock(path):
+                pass
+    assert os.path.exists(path)
+    with pipeline_lock(path):
+        pass
+
+
+def test_leftover_empty_lock_file_is_not_held(tmp_path):
+    path = tmp_path / "pipeline.lock"
+    path.write_text("")
+    with pipeline_lock(str(path)):
+        assert path.read_text() == str(os.getpid())
+
+
+def test_datalake_watermark_waits_for_files_to_settle(tmp_path, monkeypatch):
+    monkeypatch.setattr(Pipeline_daemon, "DATA_LAKE_DIR", str(tmp_path))
+    (tmp_path / "stocks.csv").write_text("store_id,product_id,quantity\n1,1,5\n")
+    assert datalake_watermark(settle=60) is None
+    marks = datalake_watermark(settle=0)
+    assert [m[0] for m in marks] == ["stocks.csv"]
+
+
+def test_affected_stages():
+    assert affected_stages([], STAGES) == []
+    assert affected_stages(["stocks.csv"], STAGES) == Pipeline_daemon.STAGING_STAGES
+    assert affected_stages(["stocks.csv", "order_items.csv"], STAGES) == STAGES
+    assert affected_stages(["exchange_rates.csv"], STAGES[:-1]) == STAGES[:-1]
+
+
+def test_content_fingerprints_ignore_run_metadata(tmp_path):
+    f = tmp_path / "stocks.csv"
+    f.write_text("store_id,quantity,extracted_at,data_source\n1,5,2024-01-01,DataLake\n")
+    before = Pipeline_daemon.content_fingerprints(str(tmp_path))
+    f.write_text("store_id,quantity,extracted_at,data_source\n1,5,2024-02-01,DataLake\n")
+    assert Pipeline_daemon.content_fingerprints(str(tmp_path)) == before
+    f.write_text("store_id,quantity,extracted_at,data_source\n1,6,2024-02-01,DataLake\n")
+    assert Pipeline_daemon.content_fingerprints(str(tmp_path)) != before
+
+
+def test_exchange_rate_timestamp_alone_is_not_a_change(tmp_path):
+    f = tmp_path / "exchange_rates.csv"
+    f.write_text("base,timestamp,rates\nUSD,1700000000,{'EGP': 48.1}\n")
+    before = Pipeline_daemon.content_fingerprints(str(tmp_path))
+    f.write_text("base,timestamp,rates\nUSD,1700003600,{'EGP': 48.1}\n")
+    assert Pipeline_daemon.content_fingerprints(str(tmp_path)) == before
+
+
+def test_failed_source_does_not_block_the_others(tmp_path, monkeypatch):
+    monkeypatch.setattr(Pipeline_daemon, "EXTRACT_DIR", str(tmp_path))
+    ran = []
+    monkeypatch.setattr(Pipeline_daemon, "run_stage", ran.append)
+
+    def extract_datalake():
+        (tmp_path / "stocks.csv").write_text("store_id,quantity\n1,5\n")
+        return True
+
+    extractors = {"API": lambda: False, "DataLake": extract_datalake}
+    state = {}
+    extracted = Pipeline_daemon.run_batch(["API", "DataLake"], STAGES, state, extractors)
+    assert extracted == ["DataLake"]
+    assert ran == Pipeline_daemon.STAGING_STAGES
+    assert "stocks.csv" in state["content"]
@@ -0,0 +1,66 @@
+import sqlite3
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from Pushdown import build_count_select, build_select, read_csv_pushdown, required_columns
+
+
+@pytest.fixture
+def order_items():
+    return pd.DataFrame({
+        "order_id": [1, 1, None, 2, 3, 4],
+        "item_id": [1, 2, 1, 1, 1, 1],
+        "product_id": [8, 4, 5, None, 7, 7],
+        "quantity": [2, 1, 1, 1, -1, 3],
+        "list_price": [10.0, 20.0, 30.0, 40.0, 50.0, -5.0],
+        "discount": [0.1] * 6,
+        "Extraction_Date": [1.0] * 6,
+        "source": ["SQL-Server"] * 6,
+        "unused": ["x"] * 6,
+    })
+
+
+def quality_check_keeps(df):
+    """Quality_check's order_items rules applied to the full table."""
+    df = df.dropna(subset=["order_id", "product_id"])
+    return df[(df["list_price"] >= 0) & (df["quantity"] >= 0)]
+
+
+def test_projection_skips_unused_and_metadata_columns():
+    assert "unused" not in required_columns("order_items.csv")
+    assert "extracted_at" not in required_columns("order_items.csv")
+    assert required_columns("products.csv") is None  # Modeling copies the whole dimension
+
+
+def test_sql_pushdown_keeps_exactly_the_rows_quality_check_keeps(order_items):
+    conn = sqlite3.connect(":memory:")
+    order_items.to_sql("order_items", conn, index=False)
+
+    pushed = pd.read_sql(build_select("order_items"), conn)
+    expected = quality_check_keeps(order_items)
+    assert pushed["order_id"].tolist() == expected["order_id"].tolist()
+    assert "unused" not in pushed.columns
+
+    nulls, invalid = conn.execute(build_count_select("order_items")).fetchone()
+    assert (nulls, invalid) == (2, 2)
+    assert nulls + invalid + len(pushed) == len(order_items)
+
+
+def test_csv_pushdown_counts_rows_it_filters(order_items, tmp_path):
+    path = tmp_path / "order_items.csv"
+    order_items.to_csv(path, index=False)
+
+    df, counts = read_csv_pushdown(str(path), "order_items.csv")
+    assert len(df) == len(quality_check_keeps(order_items))
+    assert counts == {"nulls_filtered": 2, "invalid_filtered": 2}
+    assert list(df.columns) == [c for c in order_items.columns if c != "unused"]
+
+
+def test_pushdown_does_not_import_stage_scripts():
+    code = "import sys, Pushdown; print(sorted(m for m in ('Transformation', 'Modeling', 'Quality_check') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+import Query_service
+from Query_service import (MartQueryService, ResultCache, compute_kpis, compute_top_n, filter_sales,
+                           load_sales, make_handler, parse_filters)
+
+
+@pytest.fixture(scope="module")
+def sales(mart_dir):
+    return load_sales(mart_dir)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResultCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_cache_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(Query_service.time, "monotonic", lambda: now[0])
+    cache = ResultCache(max_size=10, ttl=5)
+    cache.put("a", 1)
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats() == {"entries": 0, "hits": 1, "misses": 1}
+
+
+def test_new_mart_version_drops_cached_results(tmp_path, mart_dir):
+    shutil.copytree(mart_dir, tmp_path / "mart")
+    service = MartQueryService(str(tmp_path / "mart"), ResultCache())
+    first = service.kpis()
+    service.kpis()
+    assert service.cache.stats()["entries"] == 1
+    old_version = service._version
+
+    manifest = tmp_path / "mart" / "fact_sales" / "_manifest.json"
+    st = manifest.stat()
+    os.utime(manifest, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert service.kpis() == first
+    assert service._version != old_version
+    assert service.cache.stats()["entries"] == 1
+    assert all(key[0] == service._version for key in service.cache._entries)
+
+
+@pytest.mark.parametrize("start,end,store_id,category_id", [
+    (None, None, None, None),
+    ("2017-01-01", "2017-06-30", None, None),
+    (None, "2016-12-31", 2, None),
+    ("2016-03-01", None, 1, 6),
+])
+def test_queries_match_pandas(sales, start, end, store_id, category_id):
+    filtered = filter_sales(sales, start, end, store_id, category_id)
+    mask = pd.Series(True, index=sales.index)
+    if start:
+        mask &= sales["order_date"] >= start
+    if end:
+        mask &= sales["order_date"] <= end
+    if store_id is not None:
+        mask &= sales["store_id"] == store_id
+    if category_id is not None:
+        mask &= sales["category_id"] == category_id
+    expected = sales[mask]
+    assert len(filtered) == len(expected)
+
+    kpis = compute_kpis(filtered)
+    assert kpis["total_revenue"] == pytest.approx(expected["total_price"].sum(), abs=0.01)
+    assert kpis["total_orders"] == expected["order_id"].nunique()
+    assert kpis["unique_customers"] == expected["customer_id"].nunique()
+    if len(expected):
+        aov = expected.groupby("order_id")["total_price"].sum().mean()
+        assert kpis["average_order_value"] == pytest.approx(aov, abs=0.01)
+
+    top = compute_top_n(filtered, "store", "quantity", 3)
+    exact = expected.groupby("store_name")["quantity"].sum().nlargest(3)
+    assert [(t["store"], t["quantity"]) for t in top] == [(k, float(v)) for k, v in exact.items()]
+
+
+def test_parse_filters_rejects_bad_values():
+    assert parse_filters({"start": ["2017-1-5"], "store": ["2"]}) == {
+        "start": "2017-01-05", "end": None, "store_id": 2, "category_id": None}
+    with pytest.raises(ValueError):
+        parse_filters({"start": ["not-a-date"]})
+    with pytest.raises(ValueError):
+        parse_filters({"store": ["one"]})
+
+
+@pytest.fixture
+def http(mart_dir, tmp_path):
+    servers = []
+
+    def start(mart):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(MartQueryService(mart, ResultCache())))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url) as r:
+            return r.status, json.load(r)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_http_status_codes(http, mart_dir, tmp_path):
+    base = http(mart_dir)
+    assert get(f"{base}/kpis?store=1")[0] == 200
+    assert get(f"{base}/kpis?start=2017-13-45")[0] == 400
+    assert get(f"{base}/kpis?store=abc")[0] == 400
+    assert get(f"{base}/top?n=ten")[0] == 400
+    assert get(f"{base}/nope")[0] == 404
+
+    missing = http(str(tmp_path / "no_mart"))
+    status, body = get(f"{missing}/kpis")
+    assert status == 503 and "Modeling.py" in body["error"]
+    assert get(f"{missing}/headline")[0] == 503
@@ -0,0 +1,139 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Partitioning import read_fact_sales
+from Sketches import HyperLogLog, SalesSketches, SpaceSaving, TDigest, hash_values, load_sketches
+import Modeling
+
+
+@pytest.fixture(scope="module")
+def fact(mart_dir):
+    return read_fact_sales(mart_dir=mart_dir)
+
+
+@pytest.fixture(scope="module")
+def customers(mart_dir):
+    return pd.read_csv(os.path.join(mart_dir, "dim_customer.csv")).rename(columns={"cust_id": "customer_id"})
+
+
+def test_hll_register_rank_is_leading_zeros_plus_one():
+    hll = HyperLogLog(p=14)
+    hll.update([42])
+    h = int(hash_values([42])[0])
+    rest = h & ((1 << 50) - 1)
+    assert hll.registers[h >> 50] == 50 - rest.bit_length() + 1
+    assert np.count_nonzero(hll.registers) == 1
+
+
+def test_hll_count_is_close_to_exact():
+    values = np.arange(1_000_000)
+    hll = HyperLogLog()
+    hll.update(values)
+    assert abs(hll.count() - 1_000_000) / 1_000_000 < 0.03
+
+
+def test_hll_merge_equals_union_and_round_trips():
+    a, b, whole = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    a.update(range(0, 6000))
+    b.update(range(4000, 10000))
+    whole.update(range(10000))
+    a.merge(b)
+    assert np.array_equal(a.registers, whole.registers)
+    assert np.array_equal(HyperLogLog.from_dict(a.to_dict()).registers, a.registers)
+
+
+def test_hll_matches_exact_distincts_on_mart(fact):
+    for col in ["order_id", "customer_id", "product_id"]:
+        hll = HyperLogLog()
+        hll.update(fact[col])
+        exact = fact[col].nunique()
+        assert abs(hll.count() - exact) <= max(1, 0.02 * exact)
+
+
+def test_space_saving_merge_bounds_contain_true_totals():
+    rng = np.random.default_rng(0)
+    keys = rng.zipf(1.5, 50_000) % 1000
+    weights = rng.uniform(1, 10, len(keys))
+    exact = pd.Series(weights).groupby(keys).sum()
+    summary = SpaceSaving(capacity=50)
+    for chunk in np.array_split(np.arange(len(keys)), 10):
+        part = SpaceSaving(capacity=50)
+        part.update(keys[chunk], weights[chunk])
+        summary.merge(part)
+    for key, (count, error) in summary.counters.items():
+        true = exact[int(key)]
+        assert count - error - 1e-6 <= true <= count + 1e-6
+    top = [int(t["key"]) for t in summary.top(5)]
+    assert top == list(exact.nlargest(5).index)
+
+
+def test_tdigest_is_exact_on_mart(fact):
+    digest = TDigest()
+    digest.update(fact["total_price"])
+    assert digest.exact
+    for q in [0.1, 0.5, 0.9, 0.99]:
+        assert digest.quantile(q) == pytest.approx(fact["total_price"].quantile(q))
+
+
+def test_merged_tdigest_rank_error_is_small():
+    values = np.random.default_rng(1).lognormal(11, 0.6, 200_000)
+    digest = TDigest()
+    for chunk in np.array_split(values, 20):
+        part = TDigest()
+        part.update(chunk)
+        digest.merge(part)
+    assert not digest.exact
+    for q in [0.01, 0.1, 0.5, 0.9, 0.99]:
+        assert abs((values <= digest.quantile(q)).mean() - q) < 0.005
+
+
+def test_partition_sketches_merge_to_whole_fact(tmp_path, mart_dir, fact, customers):
+    shutil.copytree(os.path.join(mart_dir, "fact_sales"), tmp_path / "fact_sales")
+    for f in (tmp_path / "fact_sales").rglob("sketch.json"):
+        f.unlink()
+    merged = Modeling.build_sales_sketches(customers, str(tmp_path))
+    whole = SalesSketches().update(fact.merge(customers[["customer_id", "city", "state"]], on="customer_id", how="left"))
+    assert merged.rows == whole.rows == len(fact)
+    assert merged.revenue == pytest.approx(fact["total_price"].sum())
+    for name in whole.distinct:
+        assert np.array_equal(merged.distinct[name].registers, whole.distinct[name].registers)
+    assert merged.summary()["approx_median_line_value"] == pytest.approx(fact["total_price"].median())
+    exact = fact.groupby("product_id")["total_price"].sum().nlargest(5)
+    assert [int(t["key"]) for t in merged.top["product_revenue"].top(5)] == list(exact.index)
+    # A second build reuses every partition sketch
+    assert list((tmp_path / "fact_sales").rglob("sketch.json"))
+    again = Modeling.build_sales_sketches(customers, str(tmp_path))
+    assert again.to_dict() == merged.to_dict()
+
+
+def sketch_mtimes(root):
+    return {str(f): f.stat().st_mtime_ns for f in root.rglob("sketch.json")}
+
+
+def test_only_partitions_with_changed_customers_are_rebuilt(tmp_path, mart_dir, fact, customers):
+    shutil.copytree(os.path.join(mart_dir, "fact_sales"), tmp_path / "fact_sales")
+    for f in (tmp_path / "fact_sales").rglob("sketch.json"):
+        os.utime(f, ns=(0, 0))
+
+    # A new customer with no orders touches no partition
+    extra = pd.DataFrame({"customer_id": [customers["customer_id"].max() + 1], "city": ["Cairo"], "state": ["EG"]})
+    Modeling.build_sales_sketches(pd.concat([customers, extra], ignore_index=True), str(tmp_path))
+    assert set(sketch_mtimes(tmp_path).values()) == {0}
+
+    # Moving one customer rebuilds only the partitions holding their orders
+    moved = customers.copy()
+    cid = int(fact["customer_id"].dropna().iloc[0])
+    moved.loc[moved["customer_id"] == cid, "city"] = "Elsewhere"
+    Modeling.build_sales_sketches(moved, str(tmp_path))
+    rebuilt = [f for f, t in sketch_mtimes(tmp_path).items() if t != 0]
+    months = fact.loc[fact["customer_id"] == cid, "order_date"].dt.strftime("order_year=%Y/order_month=%m").unique()
+    assert sorted(os.path.dirname(f).split("fact_sales/")[1] for f in rebuilt) == sorted(months)
+
+
+def test_committed_headline_matches_partition_sketches(mart_dir, customers):
+    saved = load_sketches(os.path.join(mart_dir, "sales_sketches.json"))
+    assert saved.summary() == Modeling.build_sales_sketches(customers, mart_dir).summary()
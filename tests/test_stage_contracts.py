@@ -0,0 +1,61 @@
+import glob
+import os
+import shutil
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from Partitioning import read_fact_sales
+from Pushdown import read_csv_pushdown, save_pushdown_counts
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ["Quality_check.py", "Transformation.py", "Modeling.py"]
+RUN_COLUMNS = ["extracted_at"]  # stamped with the wall clock on every run
+
+
+def run_pipeline(workdir):
+    for script in STAGES:
+        subprocess.run([sys.executable, os.path.join(ROOT, script)], cwd=workdir, check=True,
+                       capture_output=True, env={**os.environ, "INGEST_INDEX_DB": "ingest_index.db"})
+    mart = os.path.join(workdir, "Information_Mart")
+    report = pd.read_csv(glob.glob(os.path.join(workdir, "quality_reports", "*.csv"))[0])
+    return mart, report.set_index("file_name").sort_index()
+
+
+def project_extracts(src, dst):
+    """What Extraction writes when the contracts are pushed down to the sources."""
+    os.makedirs(dst)
+    for path in glob.glob(os.path.join(src, "*.csv")):
+        f = os.path.basename(path)
+        full = pd.read_csv(path)
+        df, counts = read_csv_pushdown(path, f)
+        for col in ["extracted_at", "data_source"]:
+            df[col] = full.loc[df.index, col]
+        df.to_csv(os.path.join(dst, f), index=False)
+        save_pushdown_counts(dst, f, counts)
+
+
+@pytest.fixture(scope="module")
+def marts(tmp_path_factory):
+    full_dir, projected_dir = tmp_path_factory.mktemp("full"), tmp_path_factory.mktemp("projected")
+    shutil.copytree(os.path.join(ROOT, "extracted"), full_dir / "extracted")
+    project_extracts(os.path.join(ROOT, "extracted"), str(projected_dir / "extracted"))
+    return run_pipeline(str(full_dir)), run_pipeline(str(projected_dir))
+
+
+def test_projected_extracts_build_the_same_mart(marts):
+    (full, _), (projected, _) = marts
+    expected = read_fact_sales(mart_dir=full).drop(columns=RUN_COLUMNS)
+    pd.testing.assert_frame_equal(read_fact_sales(mart_dir=projected).drop(columns=RUN_COLUMNS), expected)
+    for dim in ["dim_customer", "dim_product", "dim_store", "dim_staff", "dim_date"]:
+        a = pd.read_csv(os.path.join(full, f"{dim}.csv"))
+        b = pd.read_csv(os.path.join(projected, f"{dim}.csv"))
+        pd.testing.assert_frame_equal(b.drop(columns=RUN_COLUMNS, errors="ignore"), a.drop(columns=RUN_COLUMNS, errors="ignore"))
+
+
+def test_projected_extracts_report_the_same_quality(marts):
+    (_, full), (_, projected) = marts
+    columns = ["original_rows", "final_rows", "nulls_handled", "invalid_records_removed", "data_quality_score"]
+    pd.testing.assert_frame_equal(projected[columns], full[columns])